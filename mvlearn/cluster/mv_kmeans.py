@@ -7,9 +7,55 @@ from joblib import Parallel, delayed
 from .base import BaseCluster
 from ..utils.utils import check_Xs
 from sklearn.exceptions import NotFittedError, ConvergenceWarning
-from scipy.spatial.distance import cdist
+from scipy.sparse import csr_matrix
 import warnings
 
+# Minimum number of samples processed at a time when assigning samples to
+# clusters, and the number of distances per block, which keeps the distance
+# block small enough to stay in cache
+_CHUNK_SIZE = 256
+_CHUNK_ELEMENTS = 2 ** 15
+
+
+def _chunk_size(n_clusters):
+    r'''
+    Number of samples per block of the distance computation. With few
+    clusters, more samples fit in a block of the same size, which reduces
+    the per-block overhead for small problems.
+    '''
+    return max(_CHUNK_SIZE, _CHUNK_ELEMENTS // max(n_clusters, 1))
+
+
+def _cluster_sums(X, labels, n_clusters):
+    r'''
+    Sums the samples assigned to each cluster in a single pass over the data.
+
+    Parameters
+    ----------
+    X: array-like, shape (n_samples, n_features)
+        An array of samples.
+    labels: array-like, shape (n_samples,)
+        The cluster label of each sample.
+    n_clusters: int
+        The number of clusters.
+
+    Returns
+    -------
+    sums: array-like, shape (n_clusters, n_features)
+        The sum of the samples in each cluster.
+    counts: array-like, shape (n_clusters,)
+        The number of samples in each cluster.
+    '''
+
+    n_samples = X.shape[0]
+    # Sparse cluster indicator matrix, so that the sums are one product
+    indicator = csr_matrix(
+        (np.ones(n_samples), (labels, np.arange(n_samples))),
+        shape=(n_clusters, n_samples))
+    sums = indicator @ X
+    counts = np.bincount(labels, minlength=n_clusters)
+    return sums, counts
+
 
 class MultiviewKMeans(BaseCluster):
     r'''This class implements multi-view k-means.
@@ -171,7 +217,8 @@ class MultiviewKMeans(BaseCluster):
         self.n_jobs = n_jobs
         self.centroids_ = None
 
-    def _compute_dist(self, X, Y):
+    def _compute_dist(self, X, Y, squared=False, X_sq=None, Y_sq=None,
+                      out=None):
 
         r'''
         Function that computes the pairwise distance between each row of X
@@ -185,6 +232,15 @@ class MultiviewKMeans(BaseCluster):
         Y: array-like, shape (n_samples_j, n_features)
             Another array of samples. Second dimension is the same size
             as the second dimension of X.
+        squared: bool, optional, default=False
+            If True, returns the squared distances. This is cheaper and is
+            sufficient when the distances are only used for assignment.
+        X_sq: array-like, shape (n_samples_i,), optional
+            Precomputed squared norms of the rows of X.
+        Y_sq: array-like, shape (n_samples_j,), optional
+            Precomputed squared norms of the rows of Y.
+        out: array-like, shape (n_samples_i, n_samples_j), optional
+            Array in which to store the distances.
 
         Returns
         -------
@@ -193,9 +249,99 @@ class MultiviewKMeans(BaseCluster):
             row of X and each row of Y.
         '''
 
-        distances = cdist(X, Y)
+        X = np.asarray(X)
+        Y = np.asarray(Y)
+        dtype = np.result_type(X, Y, np.float32)
+        X = X.astype(dtype, copy=False)
+        Y = Y.astype(dtype, copy=False)
+
+        # Expand ||x - y||^2 = ||x||^2 + ||y||^2 - 2 x.y so that the bulk of
+        # the work is a single matrix product
+        if X_sq is None:
+            X_sq = np.einsum('ij,ij->i', X, X)
+        if Y_sq is None:
+            Y_sq = np.einsum('ij,ij->i', Y, Y)
+        distances = np.matmul(X, Y.T, out=out)
+        distances *= -2
+        distances += X_sq[:, np.newaxis]
+        distances += Y_sq[np.newaxis, :]
+        # Clip negative values caused by floating point cancellation
+        np.maximum(distances, 0, out=distances)
+        if not squared:
+            np.sqrt(distances, out=distances)
+
         return distances
 
+    def _row_norms(self, X):
+
+        r'''
+        Squared norms of the rows of X, as used by ``_compute_dist``.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features)
+            An array of samples.
+
+        Returns
+        -------
+        X_sq: array-like, shape (n_samples,)
+            The squared norm of each row of X.
+        '''
+
+        X = np.asarray(X)
+        return np.einsum('ij,ij->i', X, X)
+
+    def _assign(self, X, centroids, squared=False, X_sq=None):
+
+        r'''
+        Assigns each sample to its closest centroid. Distances are computed
+        in chunks of samples so that the full distance matrix is never
+        stored.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features)
+            An array of samples.
+        centroids: array-like, shape (n_clusters, n_features)
+            The cluster centers.
+        squared: bool, optional, default=False
+            Passed to ``_compute_dist``.
+        X_sq: array-like, shape (n_samples,), optional
+            Precomputed squared norms of the rows of X.
+
+        Returns
+        -------
+        labels: array-like, shape (n_samples,)
+            The index of the closest centroid for each sample.
+        min_dists: array-like, shape (n_samples,)
+            The distance from each sample to its closest centroid.
+        '''
+
+        n_samples = X.shape[0]
+        if X_sq is None:
+            X_sq = self._row_norms(X)
+        # Centroid norms are shared by all chunks
+        centroids = np.asarray(centroids)
+        Y_sq = self._row_norms(centroids)
+        labels = np.empty(n_samples, dtype=np.intp)
+        min_dists = np.empty(n_samples)
+        chunk_size = _chunk_size(centroids.shape[0])
+        # The first block is the largest, and is reused by the others
+        buffer = None
+        for start in range(0, n_samples, chunk_size):
+            end = min(start + chunk_size, n_samples)
+            out = None if buffer is None else buffer[:end - start]
+            distances = self._compute_dist(
+                X[start:end], centroids, squared=squared,
+                X_sq=None if X_sq is None else X_sq[start:end], Y_sq=Y_sq,
+                out=out)
+            buffer = distances if buffer is None else buffer
+            np.argmin(distances, axis=1, out=labels[start:end])
+            min_dists[start:end] = distances[
+                np.arange(end - start), labels[start:end]]
+
+        return labels, min_dists
+
     def _init_centroids(self, Xs):
 
         r'''
@@ -239,7 +385,7 @@ class MultiviewKMeans(BaseCluster):
 
             # Compute the remaining n_cluster centroids
             for cent in range(self.n_clusters - 1):
-                dists = self._compute_dist(centers2, Xs[1])
+                dists = self._compute_dist(centers2, Xs[1], squared=True)
                 dists = np.min(dists, axis=1)
                 max_index = np.argmax(dists)
                 indices.append(max_index)
@@ -294,34 +440,29 @@ class MultiviewKMeans(BaseCluster):
         '''
 
         # Compute consensus vectors for final clustering
-        v1_consensus = list()
-        v2_consensus = list()
-
-        for clust in range(self.n_clusters):
-            v1_distances = self._compute_dist(Xs[0], centroids[0])
-            v1_partitions = np.argmin(v1_distances, axis=1).flatten()
-            v2_distances = self._compute_dist(Xs[1], centroids[1])
-            v2_partitions = np.argmin(v2_distances, axis=1).flatten()
+        v1_partitions, _ = self._assign(Xs[0], centroids[0], squared=True)
+        v2_partitions, _ = self._assign(Xs[1], centroids[1], squared=True)
 
-            # Find data points in the same partition in both views
-            part_indices = (v1_partitions == clust) * (v2_partitions == clust)
+        # Find data points in the same partition in both views
+        part_indices = (v1_partitions == v2_partitions)
+        consensus_parts = v1_partitions[part_indices]
 
-            # Recompute centroids based on these data points
-            if (np.sum(part_indices) != 0):
-                cent1 = np.mean(Xs[0][part_indices], axis=0)
-                v1_consensus.append(cent1)
-
-                cent2 = np.mean(Xs[1][part_indices], axis=0)
-                v2_consensus.append(cent2)
+        # Recompute centroids based on these data points
+        v1_sums, counts = _cluster_sums(
+            Xs[0][part_indices], consensus_parts, self.n_clusters)
+        v2_sums, _ = _cluster_sums(
+            Xs[1][part_indices], consensus_parts, self.n_clusters)
+        nonempty = counts > 0
 
         # Check if there are no consensus vectors
         self.centroids_ = [None, None]
-        if (len(v1_consensus) == 0):
+        if not np.any(nonempty):
             msg = 'No distinct cluster centroids have been found.'
             warnings.warn(msg, ConvergenceWarning)
         else:
-            self.centroids_[0] = np.vstack(v1_consensus)
-            self.centroids_[1] = np.vstack(v2_consensus)
+            counts = counts[nonempty, np.newaxis]
+            self.centroids_[0] = v1_sums[nonempty] / counts
+            self.centroids_[1] = v2_sums[nonempty] / counts
 
             # Check if the number of consensus clusters is less than n_clusters
             if (self.centroids_[0].shape[0] < self.n_clusters):
@@ -336,7 +477,7 @@ class MultiviewKMeans(BaseCluster):
             # n_clusters value
             self.n_clusters = self.centroids_[0].shape[0]
 
-    def _em_step(self, X, partition, centroids):
+    def _em_step(self, X, partition, centroids, X_sq=None):
 
         r'''
         A function that computes one iteration of expectation-maximization.
@@ -352,7 +493,11 @@ class MultiviewKMeans(BaseCluster):
             of the data points.
 
         centroids: array-like, shape (n_clusters, n_features)
-            The current cluster centers.
+            The current cluster centers, as a float array. This array is
+            updated in place.
+
+        X_sq: array-like, shape (n_samples,), optional
+            Precomputed squared norms of the rows of X.
 
         Returns
         -------
@@ -362,29 +507,24 @@ class MultiviewKMeans(BaseCluster):
             cluster centers.
 
         new_centers: array-like, shape (n_clusters, n_features)
-            The updated cluster centers.
+            The updated cluster centers, stored in ``centroids``.
 
         o_funct: float
             The new value of the objective function.
         '''
 
-        n_samples = X.shape[0]
-        new_centers = list()
-        for cl in range(self.n_clusters):
-            # Recompute centroids using samples from each cluster
-            mask = (partition == cl)
-            if (np.sum(mask) == 0):
-                new_centers.append(centroids[cl])
-            else:
-                cent = np.mean(X[mask], axis=0)
-                new_centers.append(cent)
-        new_centers = np.vstack(new_centers)
+        # Recompute centroids using samples from each cluster, keeping the
+        # previous centroid for empty clusters
+        sums, counts = _cluster_sums(X, partition, self.n_clusters)
+        nonempty = counts > 0
+        new_centers = np.divide(sums, counts[:, np.newaxis], out=centroids,
+                                where=nonempty[:, np.newaxis])
 
         # Compute expectation and objective function
-        distances = self._compute_dist(X, new_centers)
-        new_parts = np.argmin(distances, axis=1).flatten()
-        min_dists = distances[np.arange(n_samples), new_parts]
-        o_funct = np.sum(min_dists)
+        # Only the minimum distances need the square root
+        new_parts, min_dists = self._assign(
+            X, new_centers, squared=True, X_sq=X_sq)
+        o_funct = np.sum(np.sqrt(min_dists))
 
         return new_parts, new_centers, o_funct
 
@@ -447,10 +587,15 @@ class MultiviewKMeans(BaseCluster):
 
         # Initialize centroids for clustering
         centroids = self._init_centroids(Xs)
+        # Copy into float buffers which the EM steps update in place
+        centroids = [np.array(cent, dtype=float) for cent in centroids]
+
+        # The data is fixed across iterations, so compute its norms once
+        X_sqs = [self._row_norms(X) for X in Xs]
 
         # Initializing partitions, objective value, and loop vars
-        distances = self._compute_dist(Xs[1], centroids[1])
-        parts = np.argmin(distances, axis=1).flatten()
+        parts, _ = self._assign(
+            Xs[1], centroids[1], squared=True, X_sq=X_sqs[1])
         partitions = [None, parts]
         objective = [np.inf, np.inf]
         o_funct = [None, None]
@@ -467,7 +612,7 @@ class MultiviewKMeans(BaseCluster):
                 pre_view = (iter_num + 1) % 2
                 # Switch partitions and compute maximization
                 partitions[vi], centroids[vi], o_funct[vi] = self._em_step(
-                    Xs[vi], partitions[pre_view], centroids[vi])
+                    Xs[vi], partitions[pre_view], centroids[vi], X_sqs[vi])
             iter_num += 1
             # Track the number of iterations without improvement
             for view in range(2):
@@ -558,7 +703,8 @@ class MultiviewKMeans(BaseCluster):
         # Compute final cluster centroids
         self._final_centroids(Xs, centroids[max_ind])
 
-        self.labels_ = self.predict(Xs)
+        # Xs has already been preprocessed, so label it directly
+        self.labels_ = self._predict_labels(Xs)
 
         return self
 
@@ -586,6 +732,27 @@ class MultiviewKMeans(BaseCluster):
 
         Xs = self._preprocess_data(Xs)
 
+        return self._predict_labels(Xs)
+
+    def _predict_labels(self, Xs):
+
+        r'''
+        Assigns preprocessed samples to the fitted centroids.
+
+        Parameters
+        ----------
+        Xs : list of array-likes
+            - Xs length: n_views
+            - Xs[i] shape: (n_samples, n_features_i)
+
+            The two views of the data, as returned by ``_preprocess_data``.
+
+        Returns
+        -------
+        labels : array-like, shape (n_samples,)
+            The predicted cluster labels for each sample.
+        '''
+
         # Check whether or not centroids were properly fitted
         if self.centroids_ is None:
             msg = 'This MultiviewKMeans instance is not fitted yet.'
@@ -595,9 +762,29 @@ class MultiviewKMeans(BaseCluster):
             msg = 'This MultiviewKMeans instance has no cluster centroids.'
             raise AttributeError(msg)
 
-        dist1 = self._compute_dist(Xs[0], self.centroids_[0])
-        dist2 = self._compute_dist(Xs[1], self.centroids_[1])
-        dist_metric = dist1 + dist2
-        labels = np.argmin(dist_metric, axis=1).flatten()
+        # Assign samples in chunks rather than forming both full distance
+        # matrices. Norms are computed once, and the distance blocks of the
+        # first chunk are reused by the others
+        n_samples = Xs[0].shape[0]
+        X_sqs = [self._row_norms(X) for X in Xs]
+        Y_sqs = [self._row_norms(Y) for Y in self.centroids_]
+        labels = np.empty(n_samples, dtype=np.intp)
+        chunk_size = _chunk_size(len(self.centroids_[0]))
+        buffers = [None, None]
+        for start in range(0, n_samples, chunk_size):
+            end = min(start + chunk_size, n_samples)
+            dists = [
+                self._compute_dist(
+                    Xs[view][start:end], self.centroids_[view],
+                    X_sq=(None if X_sqs[view] is None
+                          else X_sqs[view][start:end]),
+                    Y_sq=Y_sqs[view],
+                    out=(None if buffers[view] is None
+                         else buffers[view][:end - start]))
+                for view in range(2)]
+            if buffers[0] is None:
+                buffers = dists
+            dists[0] += dists[1]
+            np.argmin(dists[0], axis=1, out=labels[start:end])
 
         return labels
@@ -2,7 +2,7 @@
 #
 # Implements multi-view kmeans clustering algorithm for data with 2-views.
 
-from .mv_kmeans import MultiviewKMeans
+from .mv_kmeans import MultiviewKMeans, _cluster_sums
 import numpy as np
 from ..utils.utils import check_Xs
 from sklearn.preprocessing import normalize
@@ -124,7 +124,8 @@ class MultiviewSphericalKMeans(MultiviewKMeans):
                          init=init, patience=patience, max_iter=max_iter,
                          n_init=n_init, tol=tol, n_jobs=n_jobs)
 
-    def _compute_dist(self, X, Y):
+    def _compute_dist(self, X, Y, squared=False, X_sq=None, Y_sq=None,
+                      out=None):
 
         r'''
         Function that computes the pairwise distance between each row of X
@@ -138,6 +139,11 @@ class MultiviewSphericalKMeans(MultiviewKMeans):
         Y: array-like, shape (n_samples_j, n_features)
             Another array of samples. Second dimension is the same size
             as the second dimension of X.
+        squared, X_sq, Y_sq:
+            Ignored. Present for consistency with the Euclidean distance
+            of :class:`MultiviewKMeans`.
+        out: array-like, shape (n_samples_i, n_samples_j), optional
+            Array in which to store the distances.
 
         Returns
         -------
@@ -146,9 +152,29 @@ class MultiviewSphericalKMeans(MultiviewKMeans):
             row of X and each row of Y.
         '''
 
-        cosine_dist = 1 - X @ np.transpose(Y)
+        cosine_dist = np.matmul(X, np.transpose(Y), out=out)
+        cosine_dist *= -1
+        cosine_dist += 1
         return cosine_dist
 
+    def _row_norms(self, X):
+
+        r'''
+        The cosine distance does not use the norms of the samples, so none
+        are computed.
+
+        Parameters
+        ----------
+        X: array-like, shape (n_samples, n_features)
+            An array of samples.
+
+        Returns
+        -------
+        X_sq: None
+        '''
+
+        return None
+
     def _init_centroids(self, Xs):
 
         r'''
@@ -225,7 +251,7 @@ class MultiviewSphericalKMeans(MultiviewKMeans):
 
         return centroids
 
-    def _em_step(self, X, partition, centroids):
+    def _em_step(self, X, partition, centroids, X_sq=None):
 
         r'''
         A function that computes one iteration of expectation-maximization.
@@ -241,7 +267,11 @@ class MultiviewSphericalKMeans(MultiviewKMeans):
             of the data points.
 
         centroids: array-like, shape (n_clusters, n_features)
-            The current cluster centers.
+            The current cluster centers, as a float array. This array is
+            updated in place.
+
+        X_sq: array-like, shape (n_samples,), optional
+            Ignored. Present for consistency with :class:`MultiviewKMeans`.
 
         Returns
         -------
@@ -251,29 +281,22 @@ class MultiviewSphericalKMeans(MultiviewKMeans):
             cluster centers.
 
         new_centers: array-like, shape (n_clusters, n_features)
-            The updated cluster centers.
+            The updated cluster centers, stored in ``centroids``.
 
         o_funct: float
             The new value of the objective function.
         '''
 
-        n_samples = X.shape[0]
-        new_centers = list()
-        for cl in range(self.n_clusters):
-            # Recompute centroids using samples from each cluster
-            mask = (partition == cl)
-            if (np.sum(mask) == 0):
-                new_centers.append(centroids[cl])
-            else:
-                cent = np.sum(X[mask], axis=0)
-                new_centers.append(cent)
-        new_centers = np.vstack(new_centers)
-        new_centers = normalize(new_centers)
+        # Recompute centroids using samples from each cluster, keeping the
+        # previous centroid for empty clusters
+        sums, counts = _cluster_sums(X, partition, self.n_clusters)
+        nonempty = counts > 0
+        new_centers = centroids
+        new_centers[nonempty] = sums[nonempty]
+        new_centers[:] = normalize(new_centers, copy=False)
 
         # Compute expectation and objective function
-        distances = self._compute_dist(X, new_centers)
-        new_parts = np.argmin(distances, axis=1).flatten()
-        min_dists = distances[np.arange(n_samples), new_parts]
+        new_parts, min_dists = self._assign(X, new_centers)
         o_funct = np.sum(min_dists)
         return new_parts, new_centers, o_funct
 
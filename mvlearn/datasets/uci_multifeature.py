@@ -1,8 +1,26 @@
 # License: MIT
 
+from functools import lru_cache
 from os.path import dirname, join
 import numpy as np
 
+_FILENAMES = ["mfeat-fou.csv", "mfeat-fac.csv", "mfeat-kar.csv",
+              "mfeat-pix.csv", "mfeat-zer.csv", "mfeat-mor.csv"]
+
+
+@lru_cache(maxsize=None)
+def _read_view(view):
+    """
+    Parse the CSV file of one view, returning read-only arrays of its
+    features and labels. The result is cached so that each file is only
+    parsed once per session.
+    """
+    csv_file = join(dirname(__file__), "UCImultifeature", _FILENAMES[view])
+    datatemp = np.loadtxt(csv_file, delimiter=',', skiprows=1)
+    datatemp.setflags(write=False)
+    # Each file holds the labels in its last column
+    return datatemp[:, :-1], datatemp[:, -1]
+
 
 def load_UCImultifeature(select_labeled="all", views="all", shuffle=False,
                          random_state=None):
@@ -87,6 +105,10 @@ def load_UCImultifeature(select_labeled="all", views="all", shuffle=False,
     if len(select_labeled) < 1 or len(select_labeled) > 10:
         raise ValueError("If selecting examples by label, must select "
                          "at least 1 and no more than 10.")
+    for label in select_labeled:
+        # user specified a bad label
+        if label not in range(10):
+            raise ValueError("Bad label: labels must be  in 0, 1, 2,.. 9")
 
     views = list(dict.fromkeys(views))
     if len(views) == 0:
@@ -97,36 +119,20 @@ def load_UCImultifeature(select_labeled="all", views="all", shuffle=False,
             raise ValueError("Selected views must be between 0 and 5 "
                              "inclusive")
 
-    module_path = dirname(__file__)
-    folder = "UCImultifeature"
-    filenames = ["mfeat-fou.csv", "mfeat-fac.csv", "mfeat-kar.csv",
-                 "mfeat-pix.csv", "mfeat-zer.csv", "mfeat-mor.csv"]
-
-    data = []
-    for filename in filenames:
-        csv_file = join(module_path, folder, filename)
-        datatemp = np.genfromtxt(csv_file, delimiter=',')
-        data.append(datatemp[1:, :-1])
-        labels = datatemp[1:, -1]
-
-    selected_data = []
+    # Only read the requested views
+    data = {}
     for i in views:
-        datatemp = np.zeros((200*len(select_labeled), data[i].shape[1]))
-        for j, label in enumerate(select_labeled):
-            # user specified a bad label
-            if label not in range(10):
-                raise ValueError("Bad label: labels must be  in 0, 1, 2,.. 9")
-            indices = np.nonzero(labels == label)
-            datatemp[j * 200: (j+1) * 200, :] = data[i][indices, :]
-
-        np.random.seed(random_state)
-        np.random.shuffle(datatemp)
-        selected_data.append(datatemp)
-
-    selected_labels = np.zeros((200*len(select_labeled),))
-    for i in range(len(select_labeled)):
-        selected_labels[i * 200: (i+1) * 200] = select_labeled[i]
-    np.random.seed(random_state)
-    np.random.shuffle(selected_labels)
+        data[i], labels = _read_view(i)
+
+    # Select the examples of the requested labels, grouped by label in the
+    # order of select_labeled, and apply the same permutation to every view
+    # and to the labels
+    indices = np.concatenate(
+        [np.flatnonzero(labels == j) for j in select_labeled])
+    rng = np.random.RandomState(random_state)
+    indices = indices[rng.permutation(indices.size)]
+
+    selected_data = [data[i][indices] for i in views]
+    selected_labels = labels[indices]
 
     return selected_data, selected_labels
@@ -5,8 +5,10 @@
 # License: MIT
 
 import numpy as np
+from joblib import Parallel, delayed
 from scipy import linalg
 from sklearn.decomposition import PCA
+from sklearn.utils import check_random_state
 from sklearn.utils.validation import check_is_fitted
 
 
@@ -58,6 +60,11 @@ class GroupPCA(BaseDecomposer):
         Used when ``svd_solver`` == 'arpack' or 'randomized'. Pass an int
         for reproducible results across multiple function calls.
 
+    n_jobs : int (positive), default=None
+        The number of jobs to run in parallel when computing the individual
+        PCA of each view in `fit`. `None` means 1 job, `-1` means using all
+        processors.
+
     Attributes
     ----------
     components_ : array, shape (n_components, n_total_features)
@@ -146,6 +153,7 @@ class GroupPCA(BaseDecomposer):
         prewhiten=False,
         whiten=False,
         random_state=None,
+        n_jobs=None,
     ):
         self.n_components = n_components
         self.n_individual_components = n_individual_components
@@ -153,6 +161,7 @@ class GroupPCA(BaseDecomposer):
         self.prewhiten = prewhiten
         self.whiten = whiten
         self.random_state = random_state
+        self.n_jobs = n_jobs
 
     def fit(self, Xs, y=None):
         """Fit  to the data.
@@ -197,32 +206,34 @@ class GroupPCA(BaseDecomposer):
         self.individual_mean_ = [np.mean(X, axis=0) for X in Xs]
         if self.individual_pca_:
             if type(self.n_individual_components_) == int:
-                one_dimension = True
+                dimensions = [self.n_individual_components_] * n_views
             else:
-                one_dimension = False
-            self.individual_components_ = []
-            self.individual_explained_variance_ = []
-            self.individual_explained_variance_ratio_ = []
-            for i, X in enumerate(Xs):
-                if one_dimension:
-                    dimension = self.n_individual_components_
-                else:
-                    dimension = self.n_individual_components_[i]
-                pca = PCA(
-                    dimension,
-                    whiten=self.prewhiten,
-                    random_state=self.random_state,
-                )
-                X_transformed[i] = pca.fit_transform(X)
-                self.individual_components_.append(pca.components_)
-                self.individual_explained_variance_ratio_.append(
-                    pca.explained_variance_ratio_
-                )
-                self.individual_explained_variance_.append(
-                    pca.explained_variance_
+                dimensions = self.n_individual_components_
+            # The individual PCAs are independent, so run them in parallel.
+            # Each view gets its own seed so that the output does not
+            # depend on n_jobs
+            random_state = check_random_state(self.random_state)
+            seeds = random_state.randint(np.iinfo(np.int32).max, size=n_views)
+            results = Parallel(n_jobs=self.n_jobs)(
+                delayed(_fit_individual_pca)(
+                    X, dimension, self.prewhiten, seed
                 )
+                for X, dimension, seed in zip(Xs, dimensions, seeds)
+            )
+            (
+                X_transformed,
+                self.individual_components_,
+                self.individual_explained_variance_,
+                self.individual_explained_variance_ratio_,
+            ) = map(list, zip(*results))
         X_stack = np.hstack(X_transformed)
-        pca = PCA(self.n_components_, whiten=self.whiten)
+        # The 'auto' solver switches to a randomized truncated SVD for large
+        # matrices when only a fraction of the components are kept
+        pca = PCA(
+            self.n_components_,
+            whiten=self.whiten,
+            random_state=self.random_state,
+        )
         X_transformed = pca.fit_transform(X_stack)
         self.individual_projections_ = []
         self.individual_embeddings_ = []
@@ -234,8 +245,36 @@ class GroupPCA(BaseDecomposer):
         self.components_ = pca.components_
         self.explained_variance_ = pca.explained_variance_
         self.explained_variance_ratio_ = pca.explained_variance_ratio_
+        self._stacked_projection = self._compose_projection()
         return self
 
+    def _compose_projection(self):
+        """Fold the individual and stacked PCAs into a single matrix.
+
+        Returns
+        -------
+        projection : array, shape (sum(n_features), n_components)
+            The centered, stacked views multiplied by this matrix give the
+            shared principal components.
+        """
+        projection = self.components_.T
+        if self.whiten:
+            projection = projection / np.sqrt(self.explained_variance_)
+        if not self.individual_pca_:
+            return projection
+        blocks = []
+        cur_p = 0
+        for components_, explained_variance_ in zip(
+            self.individual_components_, self.individual_explained_variance_
+        ):
+            sl = slice(cur_p, cur_p + components_.shape[0])
+            block = projection[sl]
+            if self.prewhiten:
+                block = block / np.sqrt(explained_variance_)[:, None]
+            blocks.append(np.dot(components_.T, block))
+            cur_p += components_.shape[0]
+        return np.vstack(blocks)
+
     def transform(self, Xs, y=None, index=None):
         r"""Apply groupPCA to Xs.
 
@@ -276,42 +315,34 @@ class GroupPCA(BaseDecomposer):
             index_ = np.copy(index)
             index_ = np.atleast_1d(index_)
 
-        multiview_output = [
-            np.dot(X - mean, W.T)
-            for W, X, mean in (
-                zip(
-                    [self.individual_projections_[i] for i in index_],
-                    Xs,
-                    [self.individual_mean_[i] for i in index_],
+        if self.multiview_output or index is not None:
+            multiview_output = [
+                np.dot(X - mean, W.T)
+                for W, X, mean in (
+                    zip(
+                        [self.individual_projections_[i] for i in index_],
+                        Xs,
+                        [self.individual_mean_[i] for i in index_],
+                    )
                 )
-            )
-        ]
-        if self.multiview_output:
-            return multiview_output
-
-        if index is not None:
+            ]
+            if self.multiview_output:
+                return multiview_output
             return np.mean(multiview_output, axis=0,)
 
-        if self.individual_pca_:
-            for i, (X, mean, components_, explained_variance_) in enumerate(
-                zip(
-                    Xs,
-                    self.individual_mean_,
-                    self.individual_components_,
-                    self.individual_explained_variance_,
-                )
-            ):
-                X = X - mean
-                X_transformed = np.dot(X, components_.T)
-                if self.prewhiten:
-                    X_transformed /= np.sqrt(explained_variance_)
-                Xs[i] = X_transformed
-        else:
-            Xs = [X - mean for X, mean in zip(Xs, self.individual_mean_)]
-        X_stack = np.hstack(Xs)
-        X_transformed = np.dot(X_stack, self.components_.T)
-        if self.whiten:
-            X_transformed /= np.sqrt(self.explained_variance_)
+        # The individual PCAs, the stacked PCA and the whitening are all
+        # linear, so each view is projected with its block of the composed
+        # projection, without stacking the views
+        X_transformed = None
+        cur_p = 0
+        for X, mean in zip(Xs, self.individual_mean_):
+            sl = slice(cur_p, cur_p + X.shape[1])
+            X_proj = np.dot(X - mean, self._stacked_projection[sl])
+            if X_transformed is None:
+                X_transformed = X_proj
+            else:
+                X_transformed += X_proj
+            cur_p += X.shape[1]
         return X_transformed
 
     def inverse_transform(self, X_transformed, index=None):
@@ -348,7 +379,7 @@ class GroupPCA(BaseDecomposer):
             assert len(X_transformed) == len(index_)
             X_transformed = check_Xs(X_transformed)
             return [
-                np.dot(X, A.T) + mean
+                _project_add_mean(X, A, mean)
                 for X, A, mean in (
                     zip(
                         X_transformed,
@@ -359,7 +390,7 @@ class GroupPCA(BaseDecomposer):
             ]
         if index is not None:
             return [
-                np.dot(X_transformed, A.T) + mean
+                _project_add_mean(X_transformed, A, mean)
                 for A, mean in (
                     zip(
                         [self.individual_embeddings_[i] for i in index_],
@@ -388,11 +419,57 @@ class GroupPCA(BaseDecomposer):
                 X_i = X_stack[:, sl]
                 if self.prewhiten:
                     X_i *= np.sqrt(explained_variance_)
-                X_i = np.dot(X_i, components_)
-                X_i = X_i + mean
-                Xs.append(X_i)
+                Xs.append(_project_add_mean(X_i, components_.T, mean))
                 cur_p += n_features_i
         else:
+            X_stack += np.concatenate(self.individual_mean_)
             Xs = np.split(X_stack, np.cumsum(self.n_features_)[:-1], axis=1)
-            Xs = [X + mean for X, mean in zip(Xs, self.individual_mean_)]
         return Xs
+
+
+def _project_add_mean(X, A, mean):
+    """Compute ``np.dot(X, A.T) + mean`` with a single output allocation."""
+    X_out = np.dot(X, A.T)
+    X_out += mean
+    return X_out
+
+
+def _fit_individual_pca(X, dimension, prewhiten, random_state):
+    """Fit the PCA of a single view.
+
+    Parameters
+    ----------
+    X : array, shape (n_samples, n_features)
+        The view to reduce.
+
+    dimension : int
+        The number of components to extract.
+
+    prewhiten : bool
+        Whether the reduced view should be whitened.
+
+    random_state : int, RandomState instance or None
+        Passed to the PCA.
+
+    Returns
+    -------
+    X_transformed : array, shape (n_samples, dimension)
+        The reduced view.
+
+    components : array, shape (dimension, n_features)
+        The principal axes.
+
+    explained_variance : array, shape (dimension,)
+        The variance explained by each component.
+
+    explained_variance_ratio : array, shape (dimension,)
+        The fraction of variance explained by each component.
+    """
+    pca = PCA(dimension, whiten=prewhiten, random_state=random_state)
+    X_transformed = pca.fit_transform(X)
+    return (
+        X_transformed,
+        pca.components_,
+        pca.explained_variance_,
+        pca.explained_variance_ratio_,
+    )
@@ -258,6 +258,7 @@ def _initial_svds(
     signal_ranks=None,
     normalized_scores=False,
     sval_thresh=None,
+    hermitian=False,
 ):
     """
     Computes a low rank SVD of each view in a list of data views.
@@ -284,6 +285,10 @@ def _initial_svds(
         components whose singular value is below this threshold. A list
         will specify for each view separately.
 
+    hermitian : bool
+        Whether or not each view is a symmetric (hermitian) matrix, such as
+        a kernel matrix. See ``svd_wrapper``.
+
     Returns
     -------
     reduced : list of array-like
@@ -302,11 +307,12 @@ def _initial_svds(
     svds = [None] * n_views
     reduced = [None] * n_views
     for b in range(n_views):
-        U, D, V = svd_wrapper(Xs[b], rank=signal_ranks[b])
+        U, D, V = svd_wrapper(Xs[b], rank=signal_ranks[b],
+                              hermitian=hermitian)
 
-        # possibly threshold SVD components
+        # possibly threshold SVD components, always discarding exact zeros
         if sval_thresh[b] is not None:
-            to_keep = D >= sval_thresh[b]
+            to_keep = (D >= sval_thresh[b]) & (D > 0)
             if sum(to_keep) == 0:
                 raise ValueError(
                     f"all singular values of view {b} where thresholded at" +
@@ -6,13 +6,14 @@
 import numpy as np
 from itertools import combinations
 from warnings import warn
+from scipy.linalg import solve_triangular
 from sklearn.metrics import pairwise_kernels
 from ..utils import check_Xs, param_as_list
-from ..compose import SimpleSplitter
 from ..utils import eigh_wrapper
 from .base import BaseCCA, _check_regs, _initial_svds, _deterministic_decomp
 from sklearn.utils.validation import check_is_fitted
-from sklearn.utils import check_array
+from sklearn import get_config
+from sklearn.utils import check_array, gen_batches
 
 
 class KMCCA(BaseCCA):
@@ -28,7 +29,11 @@ class KMCCA(BaseCCA):
     kernel : str, callable, or list (default 'linear')
         The kernel function to use. This is the metric argument to
         ``sklearn.metrics.pairwise.pairwise_kernels``. A list will
-        specify for each view separately.
+        specify for each view separately. With 'precomputed', each view
+        passed to ``fit`` is its training kernel matrix, and each view
+        passed to ``transform`` is its kernel against the training
+        samples. This avoids recomputing the kernels when refitting with
+        different ``regs``, ``diag_mode`` or ``n_components``.
 
     kernel_params : dict, or list (default {})
         Key word arguments to ``sklearn.metrics.pairwise.pairwise_kernels``.
@@ -176,6 +181,10 @@ class KMCCA(BaseCCA):
     :math:`O(mn)` instead of :math:`O(n^2)` and becomes :math:`O(nm^2)` instead
     of :math:`O(n^3)` [#3kmcca]_.
 
+    Kernel matrices and their decompositions are computed in the precision
+    of the input views, so passing float32 views halves the memory used by
+    the kernel matrices and speeds up their decompositions.
+
     See also
     --------
     MCCA
@@ -235,6 +244,11 @@ class KMCCA(BaseCCA):
 
     def _fit(self, Xs):
         """Helper method for `.fit` function"""
+        # Check parameters before computing any kernel
+        if self.diag_mode not in {"A", "B", "C"}:
+            raise ValueError(
+                f"diag_mode must be one of 'A', 'B' or 'C', "
+                f"got {self.diag_mode!r}")
         Xs, self.n_views_, _, self.n_features_ = check_Xs(
             Xs, multiview=True, return_dimensions=True)
 
@@ -266,7 +280,9 @@ class KMCCA(BaseCCA):
                 K = L @ L.T
                 del L
             if centers[view]:
-                K, col_mean, mat_mean = _center_kernel(K)
+                # A precomputed kernel may be the input view itself
+                K, col_mean, mat_mean = _center_kernel(
+                    K, copy=np.may_share_memory(K, Xs[view]))
                 self.kernel_col_means_[view] = col_mean
                 self.kernel_mat_means_[view] = mat_mean
             Ks.append(K)
@@ -303,19 +319,52 @@ class KMCCA(BaseCCA):
         """
         check_is_fitted(self)
         X = check_array(X)
+        dual_vars = self.dual_vars_[view]
         if self.pgso:
-            K = self._get_kernel(X, view=view, Y=self.pgso_Xs_[view])
-            L = _pgso_construct(K, self.pgso_Ls_[view],
-                                self.pgso_idxs_[view], self.pgso_norms_[view])
-            K = L @ self.pgso_Ls_[view].T
+            Y = self.pgso_Xs_[view]
+            kernel = self.kernel[view] if isinstance(self.kernel, list) \
+                else self.kernel
+            if kernel == 'precomputed':
+                # Only the kernel against the pivot samples is needed
+                X = X[:, self.pgso_idxs_[view]]
+            # The approximate kernel L @ pgso_Ls_.T is never formed
+            pgso_dual_vars = self.pgso_Ls_[view].T @ dual_vars
+            pgso_sums = np.sum(self.pgso_Ls_[view], axis=0)
         else:
-            K = self._get_kernel(X, view=view, Y=self.Xs_[view])
-        if self.kernel_col_means_[view] is not None:
-            row_means = np.sum(K, axis=1)[:, np.newaxis] / K.shape[0]
-            K -= self.kernel_col_means_[view]
-            K -= row_means
-            K += self.kernel_mat_means_[view]
-        return np.dot(K, self.dual_vars_[view])
+            Y = self.Xs_[view]
+
+        # Compute the kernel against the training samples in batches of
+        # rows, so that its size is bounded by sklearn's working_memory
+        working_memory = get_config().get('working_memory', 1024)
+        chunk_n_rows = int(working_memory * 2 ** 20 // (8 * Y.shape[0]))
+        chunk_n_rows = max(1, min(chunk_n_rows, X.shape[0]))
+        scores = []
+        row_sums = []
+        for batch in gen_batches(X.shape[0], chunk_n_rows):
+            K = self._get_kernel(X[batch], view=view, Y=Y)
+            if self.pgso:
+                L = _pgso_construct(K, self.pgso_Ls_[view],
+                                    self.pgso_idxs_[view],
+                                    self.pgso_norms_[view])
+                scores.append(L @ pgso_dual_vars)
+                row_sums.append(L @ pgso_sums)
+            else:
+                scores.append(np.dot(K, dual_vars))
+                row_sums.append(np.sum(K, axis=1))
+        scores = np.concatenate(scores)
+        row_sums = np.concatenate(row_sums)
+
+        col_means = self.kernel_col_means_[view]
+        if col_means is not None:
+            # Centering the kernel is applied to the scores instead, as
+            # (K - col_means - row_means + mat_mean) @ dual_vars, where the
+            # row means are over the training samples
+            row_means = row_sums[:, np.newaxis] / len(col_means)
+            dual_sums = np.sum(dual_vars, axis=0)
+            scores -= col_means @ dual_vars
+            scores -= row_means * dual_sums
+            scores += self.kernel_mat_means_[view] * dual_sums
+        return scores
 
     def _get_kernel(self, X, view, Y=None):
         """
@@ -394,7 +443,7 @@ def _pgso_decomp(K, tol=0.1):
     N = K.shape[0]
     norm2 = K.diagonal().copy()
     norm2_sum = sum(norm2)
-    L = np.zeros(K.shape)
+    L = np.zeros(K.shape, dtype=K.dtype)
     max_sizes = []
     max_indices = []
     M = 0
@@ -437,10 +486,12 @@ def _pgso_construct(K, L, indices, maxs):
         L_oos : numpy.ndarray, shape (n_samples, r)
             The lower triangular approximation matrix
     """
-    L_oos = np.zeros((K.shape[0], L.shape[1]))
-    for j in range(L.shape[1]):
-        L_oos[:, j] = (
-            K[:, j] - L_oos[:, :j] @ L[indices[j], :j].T) / maxs[j]
+    # The Gram-Schmidt recursion for each new sample is a forward
+    # substitution against the rows of L at the pivot indices, which are
+    # lower triangular with the maximums on their diagonal
+    T = np.tril(L[indices], k=-1)
+    T[np.diag_indices_from(T)] = maxs
+    L_oos = solve_triangular(T, K.T, lower=True).T
     return L_oos
 
 
@@ -516,10 +567,13 @@ def _kmcca_gevp(
         # put sval_thresh on the scale of svals K.
         sval_thresh *= Ks[0].shape[0]
 
+    # Kernel matrices are symmetric, so their SVDs are computed from
+    # symmetric eigendecompositions
     Us, svds = _initial_svds(Ks,
                              signal_ranks=signal_ranks,
                              normalized_scores=True,
-                             sval_thresh=sval_thresh)
+                             sval_thresh=sval_thresh,
+                             hermitian=True)
     svals = [svd[1] for svd in svds]
 
     Us, n_views, n_samples, n_features_reduced = check_Xs(
@@ -537,38 +591,53 @@ def _kmcca_gevp(
         svals=svals, regs=regs, diag_mode=diag_mode, n_samples=n_samples
     )
 
-    # constructe matrix for eigen decomposition
-    C = [[None for _ in range(n_views)] for _ in range(n_views)]
-    for b in range(n_views):
-        C[b][b] = np.eye(n_features_reduced[b])
-
-    for (a, b) in combinations(range(n_views), 2):
-        U_a = Us[a]
-        s_a = svals[a]
-        t_a = reg_svals[a]
-        q_a = s_a * (1 / np.sqrt(t_a))
-
-        U_b = Us[b]
-        s_b = svals[b]
-        t_b = reg_svals[b]
-        q_b = s_b * (1 / np.sqrt(t_b))
-
-        C[a][b] = (U_a * q_a).T @ (U_b * q_b)
-        C[b][a] = C[a][b].T
-
-    C = np.block(C)
-
-    gevals, gevecs = eigh_wrapper(A=C, rank=n_components)
-    gevecs = [gevec.T for gevec in SimpleSplitter(
-        n_features_reduced).fit_transform(gevecs.T)]
+    # whitened view scores, whose cross products are the blocks of the
+    # matrix for eigen decomposition
+    Us_white = [Us[b] * (svals[b] * (1 / np.sqrt(reg_svals[b])))
+                for b in range(n_views)]
+
+    if n_views == 2 and n_components <= min(n_features_reduced):
+        # The eigenvectors of [[I, C_01], [C_10, I]] with the largest
+        # eigenvalues are [u; v] / sqrt(2) for the leading singular
+        # triplets (u, s, v) of C_01, with eigenvalues 1 + s. These are
+        # obtained from the smaller of the two Gram matrices of C_01.
+        transpose = n_features_reduced[0] > n_features_reduced[1]
+        if transpose:
+            M = Us_white[1].T @ Us_white[0]
+        else:
+            M = Us_white[0].T @ Us_white[1]
+        sq_svals, U = eigh_wrapper(A=M @ M.T, rank=n_components)
+        D = np.sqrt(np.maximum(sq_svals, 0))
+        V = M.T @ U
+        V /= np.where(D > 0, D, 1)
+        gevals = 1 + D
+        gevecs = [U / 2 ** 0.5, V / 2 ** 0.5]
+        if transpose:
+            gevecs = gevecs[::-1]
+    else:
+        # construct matrix for eigen decomposition, writing each block
+        # directly into place
+        bounds = np.cumsum([0] + list(n_features_reduced))
+        blocks = [slice(bounds[b], bounds[b + 1]) for b in range(n_views)]
+        C = np.zeros((bounds[-1], bounds[-1]), dtype=Us_white[0].dtype)
+        # the diagonal blocks are identities
+        np.fill_diagonal(C, 1)
+
+        for (a, b) in combinations(range(n_views), 2):
+            np.matmul(Us_white[a].T, Us_white[b], out=C[blocks[a], blocks[b]])
+            C[blocks[b], blocks[a]] = C[blocks[a], blocks[b]].T
+
+        gevals, gevecs = eigh_wrapper(A=C, rank=n_components)
+        gevecs = [gevecs[blocks[b]] for b in range(n_views)]
 
     dual_vars = [(Us[b] / np.sqrt(reg_svals[b])) @ gevecs[b]
                  for b in range(n_views)]
 
     scores = [Ks[b] @ dual_vars[b] for b in range(n_views)]
-    common_scores = sum(scores)
-    common_norms = np.linalg.norm(common_scores, axis=0)
-    common_scores_normed = common_scores / common_norms
+    common_scores_normed = sum(scores)
+    common_norms = np.sqrt(
+        np.einsum('ij,ij->j', common_scores_normed, common_scores_normed))
+    common_scores_normed /= common_norms
 
     # enforce deterministic output due to possible sign flips
     common_scores_normed, scores, dual_vars = _deterministic_decomp(
@@ -633,7 +702,7 @@ def _regularize_svals(svals, regs=None, diag_mode="A",
     return reg_svals
 
 
-def _center_kernel(K):
+def _center_kernel(K, copy=True):
     """
     Centers a kernel matrix data.
 
@@ -642,6 +711,9 @@ def _center_kernel(K):
     K : np.ndarray, shape (n,n)
         A kernel matrix
 
+    copy : bool, optional (default True)
+        If False, K is centered in place.
+
     Returns
     -------
     K_c : numpy.ndarray, shape (n,n)
@@ -656,6 +728,10 @@ def _center_kernel(K):
 
     col_mean = np.mean(K, axis=0)
     mat_mean = np.mean(col_mean)
-    K_c = K - col_mean - col_mean[:, np.newaxis] + mat_mean
+    # The kernel is symmetric, so its row means are its column means
+    K_c = K.copy() if copy else K
+    K_c -= col_mean
+    K_c -= col_mean[:, np.newaxis]
+    K_c += mat_mean
 
     return K_c, col_mean, mat_mean
@@ -512,8 +512,9 @@ def _construct_mcca_gevp(Xs, regs=None, as_lists=False):
         if regs[b] is None:
             RHS[b] = Xs[b].T @ Xs[b]
         elif isinstance(regs[b], Number):
-            RHS[b] = (1 - regs[b]) * Xs[b].T @ Xs[b] + \
-                regs[b] * np.eye(n_features[b])
+            RHS[b] = (1 - regs[b]) * Xs[b].T @ Xs[b]
+            # add the regularization to the diagonal in place
+            RHS[b].flat[::n_features[b] + 1] += regs[b]
         elif isinstance(regs[b], str):
             if regs[b] == "lw":
                 RHS[b] = ledoit_wolf(Xs[b])[0]
@@ -4,12 +4,12 @@ from scipy.linalg import eigh
 from scipy.linalg import svd as full_svd
 from sklearn.utils.extmath import svd_flip
 from scipy.sparse import issparse
-from scipy.sparse.linalg import svds
+from scipy.sparse.linalg import eigsh, svds
 import numpy as np
 from sklearn.utils import check_random_state
 
 
-def svd_wrapper(X, rank=None):
+def svd_wrapper(X, rank=None, hermitian=False):
     """
     Computes the (possibly partial) SVD of a matrix. Handles the case where
     X is either dense or sparse.
@@ -21,6 +21,10 @@ def svd_wrapper(X, rank=None):
     rank: int, None
         rank of the desired SVD. If None, is set to min(X.shape)
 
+    hermitian: bool, default=False
+        If True, X is assumed to be symmetric (hermitian) and the full SVD is
+        computed from its eigendecomposition, which is much cheaper.
+
     Output
     ------
     U, D, V
@@ -42,14 +46,24 @@ def svd_wrapper(X, rank=None):
     assert 1 <= rank and rank <= min(X.shape)
 
     if rank <= min(X.shape) - 1:
-        U, D, V = svds(X, rank)
-        U, D, V = sort_svds(U, D, V)
+        if hermitian:
+            # The largest magnitude eigenpairs give the leading singular
+            # triplets, with one product by X per iteration
+            evals, U = eigsh(X, rank, which='LM')
+            U, D, V = _hermitian_svd(evals, U)
+        else:
+            U, D, V = svds(X, rank)
+            U, D, V = sort_svds(U, D, V)
 
     else:
         assert not issparse(X)
 
-        U, D, V = full_svd(X, full_matrices=False)
-        V = V.T
+        if hermitian:
+            evals, U = eigh(X)
+            U, D, V = _hermitian_svd(evals, U)
+        else:
+            U, D, V = full_svd(X, full_matrices=False)
+            V = V.T
 
         if rank:
             U = U[:, :rank]
@@ -63,6 +77,34 @@ def svd_wrapper(X, rank=None):
     return U, D, V
 
 
+def _hermitian_svd(evals, evecs):
+    """
+    Converts the eigendecomposition of a symmetric matrix to its SVD. The
+    singular values are the absolute eigenvalues, and the right singular
+    vectors are the eigenvectors up to their sign.
+
+    Parameters
+    ----------
+    evals : array-like, shape (rank,)
+        Eigenvalues, in any order.
+
+    evecs : array-like, shape (n, rank)
+        The corresponding eigenvectors.
+
+    Output
+    ------
+    U, D, V
+        The SVD, ordered by decreasing singular values.
+    """
+    sv_reordering = np.argsort(-np.abs(evals), kind='stable')
+    evals = evals[sv_reordering]
+    U = evecs[:, sv_reordering]
+    D = np.abs(evals)
+    V = U * np.where(evals < 0, -1, 1)
+
+    return U, D, V
+
+
 def sort_svds(U, D, V):
     """
     scipy.sparse.linalg.svds orders the singular values backwards,
@@ -1,6 +1,7 @@
 import pytest
 import numpy as np
 from mvlearn.cluster.mv_spherical_kmeans import MultiviewSphericalKMeans
+from mvlearn.cluster import mv_kmeans
 from sklearn.exceptions import NotFittedError, ConvergenceWarning
 
 # EXCEPTION TESTING
@@ -354,3 +355,24 @@ def test_fit_predict_n_jobs_all(data_random):
     assert(data_random['n_test'] ==  cluster_pred.shape[0])
     for cl in cluster_pred:
         assert(cl >= 0 and cl < data_random['n_clusters'])
+
+
+def test_fit_predict_chunked(data_random, monkeypatch):
+    # Assigning samples in several chunks, with a shorter last chunk,
+    # matches assigning them all at once
+    def fit_predict():
+        kmeans = MultiviewSphericalKMeans(
+            n_clusters=4, random_state=RANDOM_SEED)
+        labels = kmeans.fit_predict(data_random['fit_data'])
+        return kmeans, labels, kmeans.predict(data_random['fit_data'])
+
+    kmeans, labels, predictions = fit_predict()
+    monkeypatch.setattr(mv_kmeans, '_CHUNK_SIZE', 7)
+    monkeypatch.setattr(mv_kmeans, '_CHUNK_ELEMENTS', 1)
+    kmeans_chunked, labels_chunked, predictions_chunked = fit_predict()
+
+    np.testing.assert_array_equal(labels, labels_chunked)
+    np.testing.assert_array_equal(predictions, predictions_chunked)
+    for centroids, centroids_chunked in zip(kmeans.centroids_,
+                                            kmeans_chunked.centroids_):
+        np.testing.assert_allclose(centroids, centroids_chunked)
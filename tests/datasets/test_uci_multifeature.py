@@ -61,6 +61,17 @@ def test_UCImultifeature_dataloader_select_labels():
     for i in range(6):
         assert data[i].shape[0] == 600
 
+def test_UCImultifeature_dataloader_select_labels_order():
+    # examples are grouped by label in set order before being permuted
+    lab = [0, 9, 4]
+    for shuffle, random_state in [(False, None), (True, 3)]:
+        data, labels = load_UCImultifeature(
+            select_labeled=lab, shuffle=shuffle, random_state=random_state)
+        grouped = np.repeat(list(set(lab)), 200)
+        seed = random_state if shuffle else 1
+        perm = np.random.RandomState(seed).permutation(grouped.size)
+        assert np.array_equal(labels, grouped[perm])
+
 def test_UCImultifeature_dataloader_select_views():
     # load data
     views = [4, 5, 1]
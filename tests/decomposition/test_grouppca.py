@@ -249,3 +249,36 @@ def test_grouppca_deterministic_output():
     assert_allclose(
         transformed_X, np.tile(transformed_X[0, :], 20).reshape(20, 2)
     )
+
+
+@pytest.mark.parametrize("n_individual_components", [None, 3, [2, 3, 4]])
+@pytest.mark.parametrize("n_samples, n_features, random_state", [
+    (100, [6, 4, 5], None),
+    # large enough for the randomized solver
+    (600, [30, 20, 25], np.random.RandomState(0)),
+])
+def test_grouppca_n_jobs(n_individual_components, n_samples, n_features,
+                         random_state):
+    # Check that fitting the individual PCAs in parallel gives the same output
+    rng = np.random.RandomState(0)
+    Xs = [
+        rng.multivariate_normal(np.zeros(p), np.eye(p), size=n_samples)
+        for p in n_features
+    ]
+    state = None if random_state is None else random_state.get_state()
+    X_r = GroupPCA(
+        n_components=2,
+        n_individual_components=n_individual_components,
+        multiview_output=False,
+        random_state=random_state,
+    ).fit_transform(Xs)
+    if state is not None:
+        random_state.set_state(state)
+    X_r2 = GroupPCA(
+        n_components=2,
+        n_individual_components=n_individual_components,
+        multiview_output=False,
+        n_jobs=2,
+        random_state=random_state,
+    ).fit_transform(Xs)
+    assert_allclose(X_r, X_r2)
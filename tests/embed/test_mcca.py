@@ -1,5 +1,7 @@
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_array_equal
+from sklearn import config_context
+from sklearn.metrics.pairwise import rbf_kernel
 from sklearn.utils import check_random_state
 from mvlearn.utils import check_Xs
 from mvlearn.embed.mcca import _i_mcca, _mcca_gevp, MCCA, \
@@ -227,6 +229,12 @@ def test_svd_reg_fail():
         mcca.fit(Xs=next(generate_mcca_test_data()))
 
 
+def test_kmcca_diag_mode_fail():
+    Xs = next(generate_mcca_test_data())
+    with pytest.raises(ValueError, match="diag_mode"):
+        KMCCA(regs=0.5, diag_mode="D").fit(Xs)
+
+
 def test_mcca_eigh_singular():
     X = [[1, 1, 1], [2, 3, 3], [2, 3, 3]]
     mcca = MCCA()
@@ -424,6 +432,63 @@ def test_pgso():
     assert np.all(np.diff(ranks, axis=0) <= 1e-10), ranks
 
 
+def test_kmcca_transform_centering():
+    # a centered linear kernel against new samples equals the linear kernel
+    # of the features centered with the training means
+    Xs = next(generate_mcca_test_data())
+    Xs_new = [X[:10] + 1 for X in Xs]
+    kmcca = KMCCA(kernel='linear', n_components=2).fit(Xs)
+    # arbitrary loadings, as fitted ones are orthogonal to the constant
+    # vector and hide the row means of the kernel
+    rng = check_random_state(0)
+    kmcca.dual_vars_ = rng.normal(size=kmcca.dual_vars_.shape)
+    for view, (X, X_new) in enumerate(zip(Xs, Xs_new)):
+        mean = np.mean(X, axis=0)
+        K = (X_new - mean) @ (X - mean).T
+        assert_almost_equal(kmcca.transform_view(X_new, view),
+                            K @ kmcca.dual_vars_[view])
+
+
+@pytest.mark.parametrize("pgso", [False, True])
+def test_kmcca_transform_batches(pgso):
+    # transforming in batches of rows does not change the scores
+    Xs = next(generate_mcca_test_data())
+    kmcca = KMCCA(kernel='rbf', regs=0.5, pgso=pgso, n_components=2)
+    scores = kmcca.fit(Xs).transform(Xs)
+    with config_context(working_memory=0.01):
+        scores_batched = kmcca.transform(Xs)
+    assert_almost_equal(scores, scores_batched)
+
+
+@pytest.mark.parametrize("pgso", [False, True])
+def test_kmcca_precomputed(pgso):
+    Xs = next(generate_mcca_test_data())
+    Xs_train = [X[:60] for X in Xs]
+    Xs_test = [X[60:] for X in Xs]
+    kmcca = KMCCA(kernel='rbf', regs=0.5, pgso=pgso, n_components=2)
+    scores = kmcca.fit(Xs_train).transform(Xs_test)
+    Ks_train = [rbf_kernel(X) for X in Xs_train]
+    Ks_test = [rbf_kernel(X, Y) for X, Y in zip(Xs_test, Xs_train)]
+    kmcca = KMCCA(kernel='precomputed', regs=0.5, pgso=pgso, n_components=2)
+    scores_pre = kmcca.fit(Ks_train).transform(Ks_test)
+    assert_almost_equal(scores, scores_pre)
+
+
+@pytest.mark.parametrize("Xs", list(generate_mcca_test_data()))
+@pytest.mark.parametrize("pgso", [False, True])
+def test_kmcca_float32(Xs, pgso):
+    # float32 views are kept in single precision throughout, both in the
+    # two-view solver and in the general block eigenproblem
+    kmcca = KMCCA(kernel='rbf', regs=0.5, pgso=pgso, n_components=2)
+    evals = kmcca.fit(Xs).evals_
+    Xs32 = [X.astype(np.float32) for X in Xs]
+    scores = kmcca.fit(Xs32).transform(Xs32)
+    assert scores.dtype == np.float32
+    for dual_vars in kmcca.dual_vars_:
+        assert dual_vars.dtype == np.float32
+    np.testing.assert_allclose(kmcca.evals_, evals, rtol=1e-4)
+
+
 @pytest.mark.parametrize("signal_ranks", [None, 2])
 @pytest.mark.parametrize("n_components", [None, 2, 'min', 'max'])
 @pytest.mark.parametrize("regs", [None, 0.5, 'lw', 'oas'])
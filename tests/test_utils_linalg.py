@@ -40,3 +40,21 @@ def test_svds_wrapper():
     assert_almost_equal(U.T @ U, np.eye(2))
     assert_almost_equal(V.T @ V, np.eye(2))
     assert np.all(np.diff(D) <= 0)
+
+
+def test_svds_wrapper_hermitian():
+    np.random.seed(0)
+    A = np.random.standard_normal((6, 6))
+    # symmetric but indefinite
+    A = A + A.T
+    U, D, V = svd_wrapper(A, hermitian=True)
+    U2, D2, V2 = svd_wrapper(A)
+    assert_almost_equal(D, D2)
+    assert_almost_equal(U, U2)
+    assert_almost_equal(V, V2)
+    assert_almost_equal((U * D) @ V.T, A)
+
+    U, D, V = svd_wrapper(A, rank=3, hermitian=True)
+    assert_almost_equal(D, D2[:3])
+    assert_almost_equal(U, U2[:, :3])
+    assert_almost_equal(V, V2[:, :3])